@@ -1,31 +1,41 @@
 import aiohttp
 import asyncio
+import os
 from typing import Optional, Union
+from metrics import MEXC_FETCH_SECONDS, DEX_FETCH_SECONDS, TELEGRAM_SEND_SECONDS, MEXC_REQUEST_ERRORS, ERRORS
 
-BASE_URL_MEXC = "https://contract.mexc.com"
-BASE_URL_DEX = "https://api.dexscreener.com"
+BASE_URL_MEXC = os.getenv("MEXC_BASE_URL", "https://contract.mexc.com")
+BASE_URL_DEX = os.getenv("DEX_BASE_URL", "https://api.dexscreener.com")
+BASE_URL_TELEGRAM = os.getenv("TELEGRAM_BASE_URL", "https://api.telegram.org")
 
-async def get_mexc_prices(session: aiohttp.ClientSession, symbols: list):
-    """Получение последней цены фьючерса с MEXC по символу."""
+async def get_mexc_prices(session: aiohttp.ClientSession, symbols: list) -> dict:
+    """
+    Получение последней цены фьючерса с MEXC по символу.
+    При ошибке запроса возвращает пустой словарь -- недостающие символы учитываются выше по стеку.
+    """
     url = f"{BASE_URL_MEXC}/api/v1/contract/ticker"
     price_data = {}
 
     try:
-        async with session.get(url) as response:
-            if response.status == 200:
-                data = await response.json()
-                for s in data.get("data", []):
-                    symbol_name = s.get("symbol")
-                    if symbol_name in symbols and s.get("lastPrice") is not None:
-                        # print("symbol_name in symbols")
-                        price_data[symbol_name] = float(s["lastPrice"])               
-                return price_data
-            else:
-                print(f"Ошибка запроса (MEXC): {response.status}, {await response.text()}")
+        with MEXC_FETCH_SECONDS.time():
+            async with session.get(url) as response:
+                if response.status == 200:
+                    data = await response.json()
+                else:
+                    MEXC_REQUEST_ERRORS.inc()
+                    print(f"Ошибка запроса (MEXC): {response.status}, {await response.text()}")
+                    return {}
+        for s in data.get("data", []):
+            symbol_name = s.get("symbol")
+            if symbol_name in symbols and s.get("lastPrice") is not None:
+                # print("symbol_name in symbols")
+                price_data[symbol_name] = float(s["lastPrice"])               
+        return price_data
     except Exception as e:
+        MEXC_REQUEST_ERRORS.inc()
         print(f"Ошибка при получении данных с MEXC: {e}")
 
-    return None
+    return {}
 
 async def get_dex_prices(session: aiohttp.ClientSession, pairs: list[tuple[str, str]]) -> dict:
     """
@@ -37,17 +47,18 @@ async def get_dex_prices(session: aiohttp.ClientSession, pairs: list[tuple[str,
         url = f"{BASE_URL_DEX}/latest/dex/pairs/{net_token}/{token_address}"
         try:
             await asyncio.sleep(0.2)
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    price = (
-                        float(data["pairs"][0]["priceUsd"])
-                        if data.get("pairs") and data["pairs"][0].get("priceUsd")
-                        else None
-                    )
-                    return ((net_token, token_address), price)
-                else:
-                    print(f"[DEX ERROR] {response.status} for {net_token}/{token_address}")
+            with DEX_FETCH_SECONDS.time():
+                async with session.get(url) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        price = (
+                            float(data["pairs"][0]["priceUsd"])
+                            if data.get("pairs") and data["pairs"][0].get("priceUsd")
+                            else None
+                        )
+                        return ((net_token, token_address), price)
+                    else:
+                        print(f"[DEX ERROR] {response.status} for {net_token}/{token_address}")
         except Exception as e:
             print(f"[DEX EXCEPTION] {net_token}/{token_address}: {e}")
         return ((net_token, token_address), None)
@@ -61,10 +72,10 @@ async def get_dex_prices(session: aiohttp.ClientSession, pairs: list[tuple[str,
     return {key: price for key, price in results if price is not None}
 
 class TelegramNotifier:
-    def __init__(self, token: str, chat_ids: list[int]):
+    def __init__(self, token: str, chat_ids: list[int], base_url: str = BASE_URL_TELEGRAM):
         self.token = token
         self.chat_ids = chat_ids
-        self.base_tg_url = f"https://api.telegram.org/bot{self.token}"
+        self.base_tg_url = f"{base_url}/bot{self.token}"
         self.send_text_endpoint = "/sendMessage"
         self.send_photo_endpoint = "/sendPhoto"
         self.delete_msg_endpoint = "/deleteMessage"
@@ -89,8 +100,10 @@ class TelegramNotifier:
             text: str,
             photo_bytes: bytes = None,
             auto_delete: Optional[Union[int, float]] = None,
-            disable_notification: bool = True
+            disable_notification: bool = True,
+            symbol: str = ""
         ):
+        """symbol -- только для метрик: к какому символу относится сообщение."""
         async with aiohttp.ClientSession() as session:
             for chat_id in self.chat_ids:
                 if photo_bytes:
@@ -116,15 +129,18 @@ class TelegramNotifier:
                     return
 
                 try:
-                    async with session.post(url, data=data) as resp:
-                        if resp.status != 200:
-                            print(f"Ошибка отправки сообщения: {await resp.text()}")
-                            continue
-                        response_json = await resp.json()
+                    with TELEGRAM_SEND_SECONDS.time():
+                        async with session.post(url, data=data) as resp:
+                            if resp.status != 200:
+                                ERRORS.inc(venue="telegram", symbol=symbol)
+                                print(f"Ошибка отправки сообщения: {await resp.text()}")
+                                continue
+                            response_json = await resp.json()
                         message_id = response_json.get("result", {}).get("message_id")
 
                         # Планируем удаление, если указано время
                         if auto_delete and message_id:
                             asyncio.create_task(self._schedule_delete(chat_id, message_id, auto_delete))
                 except Exception as e:
+                    ERRORS.inc(venue="telegram", symbol=symbol)
                     print(f"Ошибка при запросе Telegram API: {e}")
\ No newline at end of file
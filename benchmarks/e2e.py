@@ -0,0 +1,283 @@
+"""
+Сквозной бенчмарк бота против локальных заглушек MEXC, Dexscreener и Telegram Bot API.
+
+Запуск из корня репозитория (сеть не нужна, всё крутится на 127.0.0.1):
+    python -m benchmarks.e2e
+    python -m benchmarks.e2e --symbols 10,100 --ticks 30 --latency-ms 40 --jitter-ms 20 --error-rate 0.02 --rate-limit-rate 0.01
+
+Для каждого размера набора синтетических символов гоняет Main.tick() и
+печатает ticks/s, p50/p99 латентности тика, время рендера графиков и RSS.
+Результаты сохраняются в benchmarks/results/<label>.json и сравниваются
+с предыдущим прогоном (или с --baseline), чтобы регрессии между версиями
+были видны сразу.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from dataclasses import dataclass, asdict
+
+import aiohttp
+from aiohttp import web
+
+import api
+import main as bot_main
+from api import TelegramNotifier
+from metrics import CHART_RENDER_SECONDS
+from benchmarks.memory import get_rss_mb
+from utils import load_plotting
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+@dataclass
+class FaultConfig:
+    latency: float = 0.0 # sec
+    jitter: float = 0.0 # sec
+    error_rate: float = 0.0 # доля ответов 500
+    rate_limit_rate: float = 0.0 # доля ответов 429
+
+
+class StandInExchange:
+    """Заглушки MEXC contract ticker, Dexscreener pairs и Telegram Bot API."""
+
+    def __init__(self, symbols: dict, faults: FaultConfig, spread_pct: float = 6.0, seed: int = 42):
+        self.symbols = symbols # symbol -> (net_token, token_address)
+        self.faults = faults
+        self.spread = spread_pct / 100
+        self.rnd = random.Random(seed)
+        self.base_prices = {symbol: self.rnd.uniform(0.01, 10) for symbol in symbols}
+        self.by_address = {addr: symbol for symbol, (_, addr) in symbols.items()}
+        self.message_id = 0
+        self.requests = 0
+        self.runners = []
+
+    def _walk(self):
+        for symbol, price in self.base_prices.items():
+            self.base_prices[symbol] = price * (1 + self.rnd.gauss(0, 0.002))
+
+    @web.middleware
+    async def _faults_middleware(self, request, handler):
+        self.requests += 1
+        delay = self.faults.latency + self.rnd.uniform(-self.faults.jitter, self.faults.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        roll = self.rnd.random()
+        if roll < self.faults.rate_limit_rate:
+            return web.json_response({"error": "Too Many Requests"}, status=429, headers={"Retry-After": "1"})
+        if roll < self.faults.rate_limit_rate + self.faults.error_rate:
+            return web.json_response({"error": "Internal Server Error"}, status=500)
+        return await handler(request)
+
+    async def _mexc_ticker(self, request):
+        self._walk()
+        data = [
+            # MEXC-цена отклоняется от DEX в пределах ±spread, чтобы срабатывали сигналы
+            {"symbol": symbol, "lastPrice": price * (1 + self.rnd.uniform(-self.spread, self.spread))}
+            for symbol, price in self.base_prices.items()
+        ]
+        return web.json_response({"success": True, "code": 0, "data": data})
+
+    async def _dex_pair(self, request):
+        symbol = self.by_address.get(request.match_info["address"])
+        if symbol is None:
+            return web.json_response({"pairs": None})
+        return web.json_response({"pairs": [{"priceUsd": str(self.base_prices[symbol])}]})
+
+    async def _telegram(self, request):
+        await request.post()
+        self.message_id += 1
+        return web.json_response({"ok": True, "result": {"message_id": self.message_id}})
+
+    async def _serve(self, app) -> str:
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        self.runners.append(runner)
+        host, port = runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    async def start(self):
+        """Поднимает три сервера и возвращает их базовые URL (mexc, dex, telegram)."""
+        mexc = web.Application(middlewares=[self._faults_middleware])
+        mexc.router.add_get("/api/v1/contract/ticker", self._mexc_ticker)
+        dex = web.Application(middlewares=[self._faults_middleware])
+        dex.router.add_get("/latest/dex/pairs/{net}/{address}", self._dex_pair)
+        telegram = web.Application(middlewares=[self._faults_middleware])
+        telegram.router.add_post("/bot{token}/{method}", self._telegram)
+        return await self._serve(mexc), await self._serve(dex), await self._serve(telegram)
+
+    async def stop(self):
+        for runner in self.runners:
+            await runner.cleanup()
+
+
+def make_symbols(count: int) -> dict:
+    return {f"SYN{i:04d}_USDT": ("bsc", f"0x{i:040x}") for i in range(count)}
+
+def configure_bot(symbols: dict, history: int):
+    """Подменяет настройки main.py синтетическим набором символов."""
+    bot_main.SYMBOLS = list(symbols)
+    bot_main.ADDRESSES_DATA = dict(symbols)
+    bot_main.FIXED_THRESHOLD = {
+        symbol: {"is_active": True, "long_val": -5.0, "short_val": 5.0}
+        for symbol in symbols
+    }
+    bot = bot_main.Main()
+    rnd = random.Random(7)
+    for symbol_data in bot.data.values():
+        # Предзаполняем историю, чтобы рендер графиков был реалистичным
+        symbol_data["spread_pct_data"] = [
+            (close, close + rnd.uniform(0, 0.5), close - rnd.uniform(0, 0.5))
+            for close in (rnd.uniform(-4, 4) for _ in range(history))
+        ]
+    return bot
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def render_totals() -> tuple:
+    total, count = 0.0, 0
+    for style in (1, 2):
+        style_total, style_count = CHART_RENDER_SECONDS.summary(style=style)
+        total += style_total
+        count += style_count
+    return total, count
+
+async def run_scenario(count: int, args, faults: FaultConfig) -> dict:
+    symbols = make_symbols(count)
+    exchange = StandInExchange(symbols, faults, args.spread_pct)
+    mexc_url, dex_url, telegram_url = await exchange.start()
+    api.BASE_URL_MEXC, api.BASE_URL_DEX = mexc_url, dex_url
+
+    bot = configure_bot(symbols, args.history)
+    bot.notifier_q = TelegramNotifier(token="bench", chat_ids=[1], base_url=telegram_url)
+
+    render_total_before, render_count_before = render_totals()
+    tick_latencies = []
+    started = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        for i in range(args.ticks):
+            is_data_refresh_time = i % args.bar_every == 0
+            is_text_refresh_time = i < args.render_ticks
+            tick_start = time.perf_counter()
+            await bot.tick(session, is_data_refresh_time, is_text_refresh_time)
+            tick_latencies.append(time.perf_counter() - tick_start)
+            bot.reset_data()
+    elapsed = time.perf_counter() - started
+    render_total, render_count = render_totals()
+    rss = get_rss_mb()
+
+    # Отложенные удаления сообщений нам не нужны
+    pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    await exchange.stop()
+
+    renders = render_count - render_count_before
+    return {
+        "symbols": count,
+        "ticks": args.ticks,
+        "ticks_per_sec": args.ticks / elapsed if elapsed else 0.0,
+        "tick_p50_ms": percentile(tick_latencies, 50) * 1000,
+        "tick_p99_ms": percentile(tick_latencies, 99) * 1000,
+        "renders": renders,
+        "render_avg_ms": (render_total - render_total_before) / renders * 1000 if renders else 0.0,
+        "rss_mb": rss,
+        "upstream_requests": exchange.requests,
+    }
+
+def default_label() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return time.strftime("%Y%m%d-%H%M%S")
+
+def load_baseline(path: str, label: str):
+    if path:
+        with open(path) as f:
+            return json.load(f)
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    candidates = [
+        os.path.join(RESULTS_DIR, name) for name in os.listdir(RESULTS_DIR)
+        if name.endswith(".json") and name != f"{label}.json"
+    ]
+    if not candidates:
+        return None
+    with open(max(candidates, key=os.path.getmtime)) as f:
+        return json.load(f)
+
+def print_report(results: list, baseline):
+    previous = {row["symbols"]: row for row in baseline["results"]} if baseline else {}
+    keys = ("ticks_per_sec", "tick_p50_ms", "tick_p99_ms", "render_avg_ms", "rss_mb")
+    if baseline:
+        print(f"Сравнение с: {baseline['label']}")
+    for row in results:
+        print(f"--- {row['symbols']} символов ---")
+        for key in keys:
+            line = f"{key:>14}: {row[key]:10.2f}"
+            old = previous.get(row["symbols"], {}).get(key)
+            if old:
+                line += f"  ({(row[key] - old) / old * 100:+.1f}% vs {old:.2f})"
+            print(line)
+
+async def run(args):
+    faults = FaultConfig(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+    )
+    bot_main.MSG_SEND_PAUSE = args.send_pause
+    load_plotting() # импорт графического стека не должен попадать в замер первого тика
+
+    results = []
+    for count in args.symbols:
+        print(f"▶ {count} символов...")
+        results.append(await run_scenario(count, args, faults))
+
+    label = args.label or default_label()
+    baseline = load_baseline(args.baseline, label)
+    print_report(results, baseline)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{label}.json")
+    with open(path, "w") as f:
+        json.dump({"label": label, "faults": asdict(faults), "results": results}, f, indent=2)
+    print(f"Результаты сохранены: {path}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=lambda v: [int(x) for x in v.split(",")], default=[10, 100, 1000])
+    parser.add_argument("--ticks", type=int, default=10)
+    parser.add_argument("--bar-every", type=int, default=5, help="закрывать бар каждые N тиков")
+    parser.add_argument("--render-ticks", type=int, default=1, help="сколько первых тиков считать временем текстовой рассылки")
+    parser.add_argument("--history", type=int, default=bot_main.PLOT_WINDOW, help="баров истории на символ")
+    parser.add_argument(
+        "--send-pause", type=float, default=0.0,
+        help=f"пауза после отправки по символу, сек (в проде {bot_main.MSG_SEND_PAUSE}; "
+             "по умолчанию 0, чтобы тик мерил получение, расчёт и рендер, а не sleep)",
+    )
+    parser.add_argument("--spread-pct", type=float, default=6.0, help="макс. расхождение MEXC/DEX, %% (порог сигналов 5%%)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--label", default=None, help="имя прогона (по умолчанию git describe)")
+    parser.add_argument("--baseline", default=None, help="JSON прошлого прогона для сравнения")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,13 @@
+import resource
+
+
+def get_rss_mb():
+    """Текущий резидентный объём памяти процесса в МБ (пик, если /proc недоступен)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
@@ -0,0 +1,63 @@
+"""
+Бенчмарк холодного старта бота.
+
+Запуск из корня репозитория:
+    python -m benchmarks.startup
+
+Проходит тот же путь, что и бот до первого тика: импорт main (а с ним api,
+utils, metrics, profiling, feed и aiohttp), создание Main() и Main._start_services().
+Печатает время каждого шага, RSS и загружен ли к этому моменту графический стек
+(с PLOTTING_WARMUP=1 дожидается фонового прогрева). Затем -- цена ленивой
+загрузки matplotlib / scipy / numpy и рендера первого графика.
+"""
+import asyncio
+import sys
+import time
+
+from benchmarks.memory import get_rss_mb
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+def main():
+    rss_start = get_rss_mb()
+
+    _, import_ms = _timed(lambda: __import__("main"))
+    bot_main = sys.modules["main"]
+    bot, init_ms = _timed(bot_main.Main)
+
+    async def start_services():
+        start = time.perf_counter()
+        await bot._start_services()
+        services_ms = (time.perf_counter() - start) * 1000
+        if bot.plotting_warmup is not None:
+            await bot.plotting_warmup
+        return services_ms
+
+    services_ms = asyncio.run(start_services())
+    rss_ready = get_rss_mb()
+
+    heavy = [m for m in ("matplotlib", "scipy", "numpy") if m in sys.modules]
+
+    print("=== До первого тика ===")
+    print(f"Импорт main и зависимостей: {import_ms:.1f} ms")
+    print(f"Создание Main(): {init_ms:.1f} ms")
+    print(f"Main._start_services(): {services_ms:.1f} ms")
+    print(f"RSS: {rss_ready:.1f} MB (интерпретатор: {rss_start:.1f} MB)")
+    print(f"PLOTTING_WARMUP: {'да' if bot_main.PLOTTING_WARMUP else 'нет'}")
+    print(f"Тяжёлые модули загружены: {', '.join(heavy) if heavy else 'нет'}")
+
+    from utils import load_plotting
+    _, plotting_ms = _timed(load_plotting)
+    spread_data = [(i * 0.1, i * 0.1 + 0.05, i * 0.1 - 0.05) for i in range(bot_main.PLOT_WINDOW)]
+    _, render_ms = _timed(lambda: bot.utils.generate_plot_image(spread_data, style=2))
+
+    print("=== Первый график ===")
+    print(f"Загрузка графического стека: {plotting_ms:.1f} ms")
+    print(f"Рендер графика: {render_ms:.1f} ms")
+    print(f"RSS: {get_rss_mb():.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+import time
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+# Подписчик после подключения шлёт строку HELLO; без неё издатель ничего не отправляет
+# (так проверка "жив ли сокет" не превращается в подписку).
+# Строки фида -- JSON, по одному сообщению на строку:
+#   {"type": "history", "symbol": ..., "bars": [[close, high, low], ...]}     -- при подключении
+#   {"type": "tick", "ts": ..., "bar_closed": bool,
+#    "prices": {symbol: [mexc_price, dex_price]}, "bars": {symbol: [close, high, low]}}
+STREAM_LIMIT = 2 ** 24 # макс. длина строки фида
+MAX_SUBSCRIBER_BUFFER = 2 ** 22 # подписчик, отставший больше чем на столько байт, отключается
+HELLO = b"hello\n"
+HELLO_TIMEOUT = 5 # sec
+
+
+def _encode(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class FeedPublisher:
+    """
+    Рассылка нормализованных тиков и закрытых баров по Unix-сокету.
+    Один процесс ходит в MEXC/Dexscreener, сколько угодно подписчиков читают фид.
+    Медленный подписчик не тормозит публикацию -- его просто отключаем.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.writers: Set[asyncio.StreamWriter] = set()
+        self.history: Dict[str, list] = {}
+
+    async def start(self, data: dict):
+        """data -- DataFetcher.data, из него при подключении отдаётся история баров."""
+        self.history = data
+        if os.path.exists(self.path):
+            if await self._is_path_alive():
+                raise RuntimeError(f"На {self.path} уже работает другой издатель фида.")
+            os.unlink(self.path) # сокет остался от упавшего процесса
+        self.server = await asyncio.start_unix_server(self._on_connect, path=self.path)
+        print(f"📡 Фид публикуется: {self.path}")
+
+    async def _is_path_alive(self) -> bool:
+        try:
+            _, writer = await asyncio.open_unix_connection(self.path)
+        except OSError: # ConnectionRefusedError / FileNotFoundError -- никто не слушает
+            return False
+        writer.close()
+        return True
+
+    async def _on_connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            hello = await asyncio.wait_for(reader.readline(), HELLO_TIMEOUT)
+        except (asyncio.TimeoutError, ConnectionError, ValueError):
+            hello = b""
+        if hello != HELLO: # проба живости или чужой клиент -- молча закрываем
+            writer.close()
+            return
+
+        for symbol, symbol_data in self.history.items():
+            writer.write(_encode({"type": "history", "symbol": symbol, "bars": symbol_data["spread_pct_data"]}))
+        self.writers.add(writer)
+        print(f"📡 Подписчиков: {len(self.writers)}")
+        try:
+            await reader.read() # ждём отключения
+        except ConnectionError:
+            pass
+        finally:
+            self._drop(writer)
+
+    def _drop(self, writer: asyncio.StreamWriter):
+        if writer in self.writers:
+            self.writers.discard(writer)
+            writer.close()
+            print(f"📡 Подписчик отключился, осталось: {len(self.writers)}")
+
+    def publish_tick(self, prices: dict, bar_closed: bool, data: dict):
+        if not self.writers or not prices:
+            return
+        bars = {
+            symbol: symbol_data["spread_pct_data"][-1]
+            for symbol, symbol_data in data.items()
+            # спред обновлён в этом тике -- значит и бар по символу закрыт сейчас
+            if bar_closed and symbol_data["spread_pct"] is not None and symbol_data["spread_pct_data"]
+        }
+        line = _encode({
+            "type": "tick",
+            "ts": time.time(),
+            "bar_closed": bar_closed,
+            "prices": prices,
+            "bars": bars,
+        })
+        for writer in list(self.writers):
+            if writer.is_closing() or writer.transport.get_write_buffer_size() > MAX_SUBSCRIBER_BUFFER:
+                self._drop(writer)
+                continue
+            writer.write(line)
+
+    async def stop(self):
+        for writer in list(self.writers):
+            self._drop(writer)
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+class FeedSubscriber:
+    """Чтение фида FeedPublisher с автоматическим переподключением."""
+
+    def __init__(self, path: str, reconnect_delay: float = 3):
+        self.path = path
+        self.reconnect_delay = reconnect_delay
+
+    async def batches(self) -> AsyncIterator[List[dict]]:
+        """
+        Сообщения фида пачками: всё, что накопилось, пока подписчик был занят.
+        Отставший подписчик сам решает, какие тики пропустить, а не разбирает их по одному.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        reader_task = asyncio.create_task(self._read(queue))
+        try:
+            while True:
+                batch = [await queue.get()]
+                await asyncio.sleep(0) # даём _read дочитать уже пришедшие в сокет строки
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                yield batch
+        finally:
+            reader_task.cancel()
+
+    async def _read(self, queue: asyncio.Queue):
+        while True:
+            writer = None
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=STREAM_LIMIT)
+                writer.write(HELLO)
+                print(f"📡 Подключено к фиду: {self.path}")
+                async for line in reader:
+                    queue.put_nowait(json.loads(line))
+                print("📡 Фид закрыт издателем")
+            except (OSError, ValueError) as e:
+                print(f"📡 Ошибка фида {self.path}: {e}")
+            finally:
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(self.reconnect_delay)
@@ -1,13 +1,27 @@
 from api import get_dex_prices, get_mexc_prices, TelegramNotifier
-from utils import Utils
+from utils import Utils, load_plotting
+from profiling import LoopProfiler
+from feed import FeedPublisher, FeedSubscriber
+from metrics import (
+    build_app, start_metrics_server, SPREAD_CALC_SECONDS, CHART_RENDER_SECONDS, TICK_SECONDS,
+    SCHEDULER_LAG_SECONDS, ERRORS, HISTORY_SIZE, FEED_SKIPPED_TICKS
+)
 import asyncio
 import aiohttp
 from typing import Optional, Tuple, List, Dict
 import traceback
+import time
 import os
 
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 CHANEL_ID = os.getenv("CHANEL_ID")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0")) # 0 -- эндпоинт /metrics выключен
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN") # обязателен для /debug/profile, если METRICS_HOST не loopback
+FEED_MODE = os.getenv("FEED_MODE", "") # "" -- автономно, "publish" -- раздавать фид, "subscribe" -- читать фид
+FEED_SOCKET = os.getenv("FEED_SOCKET", "/tmp/sprv_feed.sock")
+PLOTTING_WARMUP = os.getenv("PLOTTING_WARMUP", "") == "1" # 1 -- грузить matplotlib в фоне сразу при старте
 
 # Settings:
 # ///////////
@@ -141,6 +155,9 @@ CALC_SPREAD_METHOD = 'a'
 # Utils:
 PLOT_WINDOW = 288 # minute
 MAX_RECONNECT_ATTEMPTS = 21
+MSG_SEND_PAUSE = 0.25 # sec, пауза между символами после отправки в Telegram
+PROFILE_TICKS = 5 # тиков на одну сессию профилирования (SIGUSR1 / POST /debug/profile)
+SLOW_CALLBACK_DURATION = 0.1 # sec, порог медленного колбэка asyncio при профилировании
 
         
 class NetworkServices():
@@ -303,16 +320,42 @@ class DataFetcher:
         except Exception as e:
             raise RuntimeError(f"Ошибка при получении цен: {e}")
 
-    async def refresh_data(self, session, is_spread_updated_time):
+    def append_bar(self, symbol: str, bar: Tuple[float, float, float]):
+        """Закрывает бар (close, high, low) по символу и начинает копить тики следующего."""
+        symbol_data = self.data[symbol]
+        symbol_data["spread_pct_data"].append(bar)
+        if len(symbol_data["spread_pct_data"]) > HIST_SPREAD_LIMIT:
+            symbol_data["spread_pct_data"] = symbol_data["spread_pct_data"][-HIST_SPREAD_LIMIT:]
+        self.temporary_tik_data[symbol] = []
+
+    async def refresh_data(
+        self, session, is_spread_updated_time,
+        prices: Optional[Dict[str, Tuple[float, float]]] = None,
+        bars: Optional[Dict[str, list]] = None,
+    ):
+        """
+        Обновляет спреды и сигналы. prices -- готовые цены из фида;
+        если не переданы, берутся с бирж. bars -- закрытые издателем бары:
+        с ними подписчик не собирает бар сам, а берёт тот же, что у издателя.
+        Возвращает использованные цены.
+        """
         try:
-            prices = await self.fetch_prices(session, SYMBOLS, self.pairs)
+            if prices is None:
+                prices = await self.fetch_prices(session, SYMBOLS, self.pairs)
             for symbol, (mexc_price, dex_price) in prices.items():
-                symbol_data = self.data[symbol]
+                symbol_data = self.data.get(symbol)
+                if symbol_data is None: # символ из фида, который этот бот не торгует
+                    continue
 
                 if not (mexc_price and dex_price):
+                    if not mexc_price:
+                        ERRORS.inc(venue="mexc", symbol=symbol)
+                    if not dex_price:
+                        ERRORS.inc(venue="dex", symbol=symbol)
                     print(f"Проблемы с расчетом спреда. Символ {symbol}. Mexc: {mexc_price}, Dex: {dex_price}")
                     continue
 
+                spread_calc_start = time.perf_counter()
                 try:
                     spread_pct = self.utils.calc_spread(mexc_price, dex_price, CALC_SPREAD_METHOD)
                     if spread_pct is None:
@@ -326,7 +369,12 @@ class DataFetcher:
                         "spread_pct": spread_pct
                     })
 
-                    if is_spread_updated_time:
+                    if is_spread_updated_time and bars is not None:
+                        if symbol in bars:
+                            self.append_bar(symbol, tuple(bars[symbol]))
+                        else:
+                            self.temporary_tik_data[symbol] = []
+                    elif is_spread_updated_time:
                         max_spread = max(self.temporary_tik_data[symbol])
                         min_spread = min(self.temporary_tik_data[symbol])
                         # debug:
@@ -336,10 +384,7 @@ class DataFetcher:
                         #     💲 Low Spread: {min_spread}
                         # """)
                         # print(text_print)
-                        symbol_data["spread_pct_data"].append((spread_pct, max_spread, min_spread))
-                        if len(symbol_data["spread_pct_data"]) > HIST_SPREAD_LIMIT:
-                            symbol_data["spread_pct_data"] = symbol_data["spread_pct_data"][-HIST_SPREAD_LIMIT:]
-                        self.temporary_tik_data[symbol] = []
+                        self.append_bar(symbol, (spread_pct, max_spread, min_spread))
 
                     msg = f"\U0001F4E2 [{symbol.replace("_USDT", "")}]: Spread: {spread_pct:.4f} %"
                     in_position_long, in_position_short = symbol_data["in_position_long"], symbol_data["in_position_short"]
@@ -358,9 +403,18 @@ class DataFetcher:
                 except Exception as ex:
                     print(f"[ERROR] refresh_data for symbol {symbol} failed: {ex}\n{traceback.format_exc()}")
 
+                finally:
+                    SPREAD_CALC_SECONDS.observe(time.perf_counter() - spread_calc_start)
+
+            for symbol in SYMBOLS:
+                HISTORY_SIZE.set(len(self.data[symbol]["spread_pct_data"]), symbol=symbol, buffer="spread_pct_data")
+                HISTORY_SIZE.set(len(self.temporary_tik_data[symbol]), symbol=symbol, buffer="temporary_tik_data")
+
         except Exception as ex:
             print(f"[ERROR] refresh_data: {ex}\n{traceback.format_exc()}")
 
+        return prices
+
 class Main(DataFetcher):
     def __init__(self):
         super().__init__()  # ← Вызов конструктора родительского класса
@@ -369,6 +423,9 @@ class Main(DataFetcher):
             chat_ids=[CHANEL_ID]  # твой chat_id или список chat_id'ов
         )
         self.connector = NetworkServices() 
+        self.profiler = LoopProfiler(PROFILE_DIR, PROFILE_TICKS, SLOW_CALLBACK_DURATION)
+        self.publisher: Optional[FeedPublisher] = FeedPublisher(FEED_SOCKET) if FEED_MODE == "publish" else None
+        self.plotting_warmup: Optional[asyncio.Future] = None
 
     def reset_data(self):
         for symbol_data in self.data.values():
@@ -384,12 +441,13 @@ class Main(DataFetcher):
     async def msg_collector(self, is_text_refresh_time: bool) -> None:
         """Collects and sends messages based on symbol data and conditions."""
 
-        async def send_signal(msg, plot_bytes=None, auto_delete=None, disable_notification=True):
+        async def send_signal(symbol, msg, plot_bytes=None, auto_delete=None, disable_notification=True):
             await self.notifier_q.send(
                 msg,
                 photo_bytes=plot_bytes,
                 auto_delete=auto_delete,
-                disable_notification=disable_notification
+                disable_notification=disable_notification,
+                symbol=symbol
             )
 
         def prepare_signal_message(symbol, symbol_data, position_side, action):
@@ -406,6 +464,7 @@ class Main(DataFetcher):
         for symbol in SYMBOLS:
             symbol_data = self.data.get(symbol)
             plot_bytes = None
+            is_sent = False
 
             try:
                 spread_pct = symbol_data.get("spread_pct")
@@ -422,37 +481,147 @@ class Main(DataFetcher):
                 if is_text_refresh_time or is_instruction:
                     # print("is_text_refresh_time or is_instruction")
                     # Generate plot once if needed
-                    plot_bytes = self.utils.generate_plot_image(spread_pct_data, style=2 if is_text_refresh_time else 1)
+                    style = 2 if is_text_refresh_time else 1
+                    with CHART_RENDER_SECONDS.time(style=style):
+                        plot_bytes = self.utils.generate_plot_image(spread_pct_data, style=style)
 
                 if is_text_refresh_time:
                     msg = symbol_data.get("msg")                    
-                    await send_signal(msg, plot_bytes=plot_bytes, auto_delete=TEXT_REFRESH_INTERVAL + 2)
+                    await send_signal(symbol, msg, plot_bytes=plot_bytes, auto_delete=TEXT_REFRESH_INTERVAL + 2)
+                    is_sent = True
 
                 if not is_instruction:
                     continue
+                is_sent = True
 
                 # Отправка сигналов на открытие
                 for position_side, _ in instruction_open:
                     msg = prepare_signal_message(symbol, symbol_data, position_side, "is_opening")
-                    await send_signal(msg, plot_bytes=plot_bytes, disable_notification=False)
+                    await send_signal(symbol, msg, plot_bytes=plot_bytes, disable_notification=False)
 
                 # Отправка сигналов на закрытие
                 for position_side, _ in instruction_close:
                     msg = prepare_signal_message(symbol, symbol_data, position_side, "is_closing")
-                    await send_signal(msg, plot_bytes=plot_bytes, disable_notification=False)
+                    await send_signal(symbol, msg, plot_bytes=plot_bytes, disable_notification=False)
 
             except Exception as ex:
                 print(f"[ERROR] msg_collector for symbol {symbol} failed: {ex}\n{traceback.format_exc()}")
 
             finally:
-                if len(SYMBOLS) > 1:
-                    await asyncio.sleep(0.25)
+                if is_sent and len(SYMBOLS) > 1:
+                    await asyncio.sleep(MSG_SEND_PAUSE)
+
+    async def tick(
+        self, session, is_data_refresh_time: bool, is_text_refresh_time: bool,
+        prices: Optional[dict] = None, bars: Optional[dict] = None,
+    ) -> None:
+        """Один тик: получение цен (или цены и закрытые бары из фида), расчёт сигналов и рассылка."""
+        if not self.profiler.enabled:
+            return await self._tick(session, is_data_refresh_time, is_text_refresh_time, prices, bars)
+        with self.profiler.tick():
+            await self._tick(session, is_data_refresh_time, is_text_refresh_time, prices, bars)
+
+    async def _tick(
+        self, session, is_data_refresh_time: bool, is_text_refresh_time: bool,
+        prices: Optional[dict], bars: Optional[dict],
+    ) -> None:
+        with TICK_SECONDS.time():
+            prices = await self.refresh_data(session, is_data_refresh_time, prices, bars)
+            if self.publisher:
+                self.publisher.publish_tick(prices, is_data_refresh_time, self.data)
+            await self.msg_collector(is_text_refresh_time)
+
+    @staticmethod
+    def _on_plotting_warmup_done(future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"[ERROR] Прогрев графического стека не удался: {future.exception()!r}")
+
+    async def _start_services(self):
+        # По умолчанию matplotlib грузится лениво при первом графике; прогрев в фоне -- по желанию
+        if PLOTTING_WARMUP:
+            self.plotting_warmup = asyncio.get_running_loop().run_in_executor(None, load_plotting)
+            self.plotting_warmup.add_done_callback(self._on_plotting_warmup_done)
+
+        self.profiler.install_signal_handler()
+        if METRICS_PORT:
+            app = build_app()
+            self.profiler.add_routes(app, METRICS_HOST, PROFILE_TOKEN)
+            await start_metrics_server(METRICS_HOST, METRICS_PORT, app)
+        if self.publisher:
+            await self.publisher.start(self.data)
+
+    @staticmethod
+    def check_feed_symbols(feed_symbols: set) -> list:
+        """Символы подписчика, которых нет в фиде издателя: по ним цены не придут никогда."""
+        missing = [symbol for symbol in SYMBOLS if symbol not in feed_symbols]
+        for symbol in missing:
+            ERRORS.inc(venue="feed", symbol=symbol)
+        if missing:
+            print(f"⚠️ Издатель не публикует символы: {', '.join(missing)}. Сигналов по ним не будет.")
+        return missing
+
+    async def _run_subscriber(self):
+        """Режим подписчика: цены берём из фида издателя, в биржи не ходим."""
+        await self._start_services()
+
+        feed_symbols = set() # символы издателя, собранные по history текущего подключения
+        is_feed_checked = False
+
+        async for batch in FeedSubscriber(FEED_SOCKET).batches():
+            try:
+                ticks = []
+                for message in batch:
+                    if message["type"] == "history":
+                        if is_feed_checked: # history после тиков -- значит, переподключились
+                            feed_symbols, is_feed_checked = set(), False
+                        ticks = [] # тики прошлого подключения уже не нужны
+                        feed_symbols.add(message["symbol"])
+                        symbol_data = self.data.get(message["symbol"])
+                        if symbol_data is not None:
+                            symbol_data["spread_pct_data"] = message["bars"][-HIST_SPREAD_LIMIT:]
+                            self.temporary_tik_data[message["symbol"]] = []
+                    elif message["type"] == "tick":
+                        ticks.append(message)
+
+                if not ticks:
+                    continue
+
+                # Отстали -- считаем сигналы только по самым свежим ценам, как в автономном режиме,
+                # но бары, закрытые издателем в пропущенных тиках, в историю всё равно кладём
+                if len(ticks) > 1:
+                    FEED_SKIPPED_TICKS.inc(len(ticks) - 1)
+                latest = ticks[-1]
+                for skipped in ticks[:-1]:
+                    if skipped["bar_closed"]:
+                        for symbol, bar in skipped["bars"].items():
+                            if symbol in self.data:
+                                self.append_bar(symbol, tuple(bar))
+
+                if not is_feed_checked:
+                    self.check_feed_symbols(feed_symbols | set(latest["prices"]))
+                    is_feed_checked = True
+
+                is_bar_closed = any(tick["bar_closed"] for tick in ticks)
+                is_text_refresh_time = (
+                    is_bar_closed if DATA_REFRESH_INTERVAL == TEXT_REFRESH_INTERVAL
+                    else self.utils.is_new_interval(TEXT_REFRESH_INTERVAL)
+                )
+                await self.tick(None, latest["bar_closed"], is_text_refresh_time, latest["prices"], latest["bars"])
+
+            except Exception as ex:
+                print(f"[ERROR] Feed loop: {ex}")
+                traceback.print_exc()
+
+            finally:
+                self.reset_data()
 
     async def _run(self):
         await self.connector.initialize_session()
         if not await self.connector.validate_session():
             raise ConnectionError("Не удалось установить сессию.")  
 
+        await self._start_services()
+
         check_session_counter = 0   
         refresh_counter = 0
 
@@ -481,8 +650,7 @@ class Main(DataFetcher):
                         else self.utils.is_new_interval(TEXT_REFRESH_INTERVAL)
                     )
 
-                    await self.refresh_data(session, is_data_refresh_time)
-                    await self.msg_collector(is_text_refresh_time)
+                    await self.tick(session, is_data_refresh_time, is_text_refresh_time)
 
             except Exception as ex:
                 print(f"[ERROR] Inner loop: {ex}")
@@ -491,11 +659,14 @@ class Main(DataFetcher):
 
             finally:
                 self.reset_data()      
+                sleep_start = time.perf_counter()
                 await asyncio.sleep(1)
+                SCHEDULER_LAG_SECONDS.observe(max(time.perf_counter() - sleep_start - 1, 0))
 
 if __name__ == "__main__":
     print("Start Bot")
     try:
-        asyncio.run(Main()._run())
+        bot = Main()
+        asyncio.run(bot._run_subscriber() if FEED_MODE == "subscribe" else bot._run())
     except KeyboardInterrupt:
         print("Остановка по Ctrl+C")
@@ -0,0 +1,187 @@
+import time
+from aiohttp import web
+from typing import Dict, Optional, Tuple
+
+# Границы бакетов по умолчанию (секунды)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = self.header()
+        for key, value in self.values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # key -> [counts по бакетам, sum, count]
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self.values.get(key)
+        if state is None:
+            state = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[0][i] += 1
+                break
+        state[1] += value
+        state[2] += 1
+
+    def time(self, **labels) -> "_Timer":
+        """Контекстный менеджер: `with HIST.time(): ...` (работает и вокруг await)."""
+        return _Timer(self, labels)
+
+    def summary(self, **labels) -> Tuple[float, int]:
+        """(sum, count) для набора меток -- удобно для бенчмарков."""
+        state = self.values.get(self._key(labels))
+        return (state[1], state[2]) if state else (0.0, 0)
+
+    def render(self) -> list:
+        lines = self.header()
+        for key, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+MEXC_FETCH_SECONDS = REGISTRY.register(Histogram(
+    "sprv_mexc_fetch_seconds", "Длительность запроса тикеров MEXC"))
+DEX_FETCH_SECONDS = REGISTRY.register(Histogram(
+    "sprv_dex_fetch_seconds", "Длительность запроса одной пары Dexscreener"))
+SPREAD_CALC_SECONDS = REGISTRY.register(Histogram(
+    "sprv_spread_calc_seconds", "Расчёт спреда и сигналов по символу",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1)))
+CHART_RENDER_SECONDS = REGISTRY.register(Histogram(
+    "sprv_chart_render_seconds", "Рендер графика спреда", labelnames=("style",)))
+TELEGRAM_SEND_SECONDS = REGISTRY.register(Histogram(
+    "sprv_telegram_send_seconds", "Отправка сообщения в Telegram"))
+TICK_SECONDS = REGISTRY.register(Histogram(
+    "sprv_tick_seconds", "Полный тик: получение цен, сигналы, рассылка"))
+SCHEDULER_LAG_SECONDS = REGISTRY.register(Histogram(
+    "sprv_scheduler_lag_seconds", "Опоздание пробуждения цикла Main._run относительно плана",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)))
+MEXC_REQUEST_ERRORS = REGISTRY.register(Counter(
+    "sprv_mexc_request_errors_total", "Сбои запроса тикеров MEXC целиком (символы без цены считаются в sprv_errors_total)"))
+ERRORS = REGISTRY.register(Counter(
+    "sprv_errors_total", "Ошибки по площадке (mexc/dex/telegram/feed) и символу",
+    labelnames=("venue", "symbol")))
+FEED_SKIPPED_TICKS = REGISTRY.register(Counter(
+    "sprv_feed_skipped_ticks_total", "Тики фида, пропущенные отставшим подписчиком (взята только самая свежая цена)"))
+HISTORY_SIZE = REGISTRY.register(Gauge(
+    "sprv_history_size", "Размер буферов истории по символу",
+    labelnames=("symbol", "buffer")))
+
+
+async def _handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(
+        body=request.app["registry"].render().encode("utf-8"),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
+def build_app(registry: Optional[MetricsRegistry] = None) -> web.Application:
+    app = web.Application()
+    app["registry"] = registry or REGISTRY
+    app.router.add_get("/metrics", _handle_metrics)
+    return app
+
+async def start_metrics_server(host: str, port: int, app: Optional[web.Application] = None) -> web.AppRunner:
+    """Запуск HTTP-эндпоинта /metrics в текущем asyncio-цикле."""
+    runner = web.AppRunner(app or build_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    print(f"📈 Метрики: http://{host}:{port}/metrics")
+    return runner
@@ -0,0 +1,186 @@
+import asyncio
+import cProfile
+import hmac
+import io
+import ipaddress
+import logging
+import os
+import pstats
+import re
+import signal
+import time
+from contextlib import contextmanager
+from aiohttp import web
+from typing import Dict, List, Optional, Tuple
+
+_SLOW_CALLBACK_RE = re.compile(r"^Executing (?P<what>.*) took (?P<seconds>[\d.]+) seconds$", re.S)
+_TASK_RE = re.compile(r"name='(?P<name>[^']*)' coro=<(?P<coro>[^\s(]+)")
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """
+    Перехватывает предупреждения asyncio вида 'Executing <...> took 0.512 seconds'
+    и копит длительности шагов по задачам (имя задачи + корутина).
+    """
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.records: List[str] = []
+        self.steps: Dict[str, List[float]] = {}
+
+    def emit(self, record):
+        message = record.getMessage()
+        match = _SLOW_CALLBACK_RE.match(message)
+        if match is None:
+            return
+        self.records.append(message)
+        task = _TASK_RE.search(match["what"])
+        key = f"{task['name']} {task['coro']}" if task else "колбэк вне задачи"
+        self.steps.setdefault(key, []).append(float(match["seconds"]))
+
+
+class LoopProfiler:
+    """
+    Профилирование живого цикла по запросу.
+    request(ticks) взводит профайлер: следующие N тиков Main.tick() идут под cProfile,
+    а asyncio в debug-режиме логирует медленные колбэки (например, блокирующий
+    matplotlib в generate_plot_image). После N тиков статистика пишется в out_dir,
+    профайлер выключается. Пока не взведён -- стоимость одна проверка атрибута.
+    Время шагов задач берётся из предупреждений asyncio, поэтому в отчёт попадают
+    только шаги дольше slow_callback_duration.
+    """
+
+    def __init__(self, out_dir: str, default_ticks: int = 5, slow_callback_duration: float = 0.1):
+        self.out_dir = out_dir
+        self.default_ticks = default_ticks
+        self.slow_callback_duration = slow_callback_duration
+        self.enabled = False # взведён или работает
+        self.remaining = 0
+        self.profile: Optional[cProfile.Profile] = None
+        self.tick_durations: List[float] = []
+        self.slow_callbacks: Optional[_SlowCallbackHandler] = None
+        self._loop_state: Optional[Tuple[bool, float]] = None
+        self.token: Optional[str] = None
+
+    def request(self, ticks: Optional[int] = None) -> int:
+        """Взвести профайлер на N тиков. Повторный запрос во время работы продлевает сессию."""
+        ticks = ticks or self.default_ticks
+        self.remaining = max(self.remaining, ticks)
+        self.enabled = True
+        print(f"🩺 Профилирование запрошено на {self.remaining} тик(ов)")
+        return self.remaining
+
+    def install_signal_handler(self, sig: int = getattr(signal, "SIGUSR1", None)) -> bool:
+        if sig is None:
+            return False
+        try:
+            asyncio.get_running_loop().add_signal_handler(sig, self.request)
+        except (NotImplementedError, RuntimeError) as e:
+            print(f"Сигнал профилирования недоступен: {e}")
+            return False
+        return True
+
+    def add_routes(self, app: web.Application, host: str, token: Optional[str] = None) -> bool:
+        """
+        POST /debug/profile?ticks=N на HTTP-сервере метрик.
+        С token -- только с заголовком X-Profile-Token; без token -- только если сервер слушает loopback.
+        """
+        if not token and not _is_loopback(host):
+            print(f"⚠️ /debug/profile не подключён: {host} не loopback, а PROFILE_TOKEN не задан")
+            return False
+        self.token = token
+        app.router.add_post("/debug/profile", self._handle_request)
+        return True
+
+    async def _handle_request(self, request: web.Request) -> web.Response:
+        if self.token and not hmac.compare_digest(request.headers.get("X-Profile-Token", ""), self.token):
+            return web.json_response({"error": "неверный X-Profile-Token"}, status=403)
+        try:
+            ticks = int(request.query.get("ticks", self.default_ticks))
+        except ValueError:
+            return web.json_response({"error": "ticks должен быть целым числом"}, status=400)
+        if ticks < 1:
+            return web.json_response({"error": "ticks должен быть >= 1"}, status=400)
+        return web.json_response({"ticks": self.request(ticks), "out_dir": os.path.abspath(self.out_dir)})
+
+    def _start(self):
+        loop = asyncio.get_running_loop()
+        self._loop_state = (loop.get_debug(), loop.slow_callback_duration)
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.slow_callback_duration
+        self.slow_callbacks = _SlowCallbackHandler()
+        logging.getLogger("asyncio").addHandler(self.slow_callbacks)
+        self.tick_durations = []
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def _stop(self) -> str:
+        self.profile.disable()
+        loop = asyncio.get_running_loop()
+        loop.set_debug(self._loop_state[0])
+        loop.slow_callback_duration = self._loop_state[1]
+        logging.getLogger("asyncio").removeHandler(self.slow_callbacks)
+
+        path = self._dump()
+        self.profile = None
+        self.slow_callbacks = None
+        self.enabled = False
+        print(f"🩺 Профилирование завершено: {path}")
+        return path
+
+    def _dump(self) -> str:
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}")
+        self.profile.dump_stats(f"{base}.pstats")
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.sort_stats("cumulative").print_stats(40)
+
+        with open(f"{base}.txt", "w") as f:
+            f.write("== Тики ==\n")
+            for i, duration in enumerate(self.tick_durations, 1):
+                f.write(f"tick {i}: {duration * 1000:.1f} ms\n")
+            f.write(f"\n== Медленные колбэки (> {self.slow_callback_duration} s) ==\n")
+            f.write("\n".join(self.slow_callbacks.records) or "нет")
+            f.write(f"\n\n== Шаги задач дольше {self.slow_callback_duration} s: count / total / max ==\n")
+            steps = sorted(self.slow_callbacks.steps.items(), key=lambda item: -sum(item[1]))
+            for key, durations in steps:
+                f.write(f"{key}: {len(durations)} / {sum(durations) * 1000:.1f} ms / {max(durations) * 1000:.1f} ms\n")
+            if not steps:
+                f.write("нет\n")
+            f.write("\n== Задачи asyncio на момент сброса ==\n")
+            for task in asyncio.all_tasks():
+                f.write(f"{task.get_name()}: {task.get_coro()!r}\n")
+            f.write("\n== cProfile (cumulative) ==\n")
+            f.write(stream.getvalue())
+        return f"{base}.txt"
+
+    @contextmanager
+    def tick(self):
+        """Обёртка одного тика; вызывается только когда enabled."""
+        if self.profile is None:
+            self._start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tick_durations.append(time.perf_counter() - start)
+            self.remaining -= 1
+            if self.remaining <= 0:
+                # Останавливаемся на следующей итерации цикла: предупреждение asyncio
+                # о текущем (последнем) шаге задачи пишется уже после его завершения
+                asyncio.get_running_loop().call_soon(self._stop_if_done)
+
+    def _stop_if_done(self):
+        if self.profile is not None and self.remaining <= 0: # не продлили ли сессию
+            self._stop()
@@ -1,14 +1,30 @@
 from datetime import datetime, timezone
 from textwrap import dedent
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from scipy.interpolate import PchipInterpolator  # монотонная интерполяция
-import numpy as np
 from decimal import Decimal, getcontext
 import io
 
 PRECISION = 30
 
+_plotting = None
+
+def load_plotting():
+    """
+    Ленивая загрузка matplotlib / scipy / numpy.
+    Тяжёлый стек подгружается только при построении первого графика
+    (или при явном прогреве), бэкенд принудительно Agg -- без дисплея.
+    Возвращает кортеж (plt, patches, np, PchipInterpolator).
+    """
+    global _plotting
+    if _plotting is None:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        import matplotlib.patches as patches
+        from scipy.interpolate import PchipInterpolator  # монотонная интерполяция
+        import numpy as np
+        _plotting = (plt, patches, np, PchipInterpolator)
+    return _plotting
+
 def to_human_digit(value):
     getcontext().prec = PRECISION
     dec_value = Decimal(str(value)).normalize()
@@ -48,6 +64,7 @@ class Utils():
         if not spread_data or len(spread_data) < 4:
             return None
 
+        plt, patches, np, PchipInterpolator = load_plotting()
         spreads = spread_data[-self.plot_window:]
 
         plt.figure(figsize=(10, 5))